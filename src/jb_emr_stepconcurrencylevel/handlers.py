@@ -2,33 +2,108 @@
 that will set the StepConcurrencyLevel attribute
 of an EMR cluster.
 """
+from __future__ import annotations
+
 import logging
-from typing import Any, MutableMapping, Optional
+import os
+import weakref
+from typing import TYPE_CHECKING, Any, MutableMapping, Optional, Tuple
 
+from botocore.config import Config
+from botocore.exceptions import ClientError
 from cloudformation_cli_python_lib import (
     Action,
-    HandlerErrorCode,
     OperationStatus,
     ProgressEvent,
     Resource,
-    SessionProxy,
     exceptions,
 )
 
 from .models import ResourceHandlerRequest, ResourceModel
 
+if TYPE_CHECKING:
+    from cloudformation_cli_python_lib import SessionProxy
+
 # Use this logger to forward log messages to CloudWatch Logs.
 LOG = logging.getLogger(__name__)
-LOG.setLevel("INFO")
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "WARNING").upper()
+# Unknown level names would make setLevel raise and break every handler.
+LOG.setLevel(LOG_LEVEL if isinstance(logging.getLevelName(LOG_LEVEL), int)
+             else "WARNING")
 TYPE_NAME = "JB::EMR::StepConcurrencyLevel"
+MIN_LEVEL, MAX_LEVEL = 1, 256
+LEVEL_ERROR = "Step Concurrency Level must be between {} and {}, {} was given."
+THROTTLING_CODES = ("ThrottlingException", "RequestLimitExceeded")
+INVALID_REQUEST_CODES = ("InvalidRequestException",)
+# Only from describe_cluster do these codes mean EMR does not know the
+# cluster ID; from the write calls they are ordinary validation errors.
+NOT_FOUND_CODES = ("ClusterNotFound", "InvalidRequestException")
 
 resource = Resource(TYPE_NAME, ResourceModel)  # pylint: disable=invalid-name
 test_entrypoint = resource.test_entrypoint  # pylint: disable=invalid-name
 
+# EMR clients are expensive to build, so one is kept per session for as
+# long as that session is alive.
+_EMR_CLIENTS: MutableMapping[SessionProxy, Any] = weakref.WeakKeyDictionary()
+_EMR_CONFIG = Config(max_pool_connections=10, retries={"mode": "adaptive"})
+
+
+def get_emr_client(session: Optional[SessionProxy]) -> Any:
+    """This function will return an EMR client for the given session,
+    creating it only on first use
+
+    Attributes:
+        session (Optional[SessionProxy]): The session proxy for connecting
+            to the needed AWS API client
+
+    Returns:
+        Any: An EMR client bound to the session
+    """
+    client = _EMR_CLIENTS.get(session)
+    if client is None:
+        client = session.client('emr', config=_EMR_CONFIG)
+        _EMR_CLIENTS[session] = client
+    return client
+
+
+def log_response(action: str, response: dict) -> None:
+    """This function will log the request ID of an API response, and the
+    full response only when debug logging is enabled
+
+    Attributes:
+        action (str): A short description of the API call that was made
+        response (dict): The response returned by the API call
+    """
+    LOG.info("%s request ID: %s", action,
+             response.get("ResponseMetadata", {}).get("RequestId"))
+    LOG.debug("%s response: %s", action, response)
+
+
+def handler_error(error: ClientError, action: str, cluster_id: str) -> Exception:
+    """This function will map an AWS client error to the CloudFormation
+    handler exception that best describes it
+
+    Attributes:
+        error (ClientError): The error raised by the AWS API client
+        action (str): The handler action that failed, used in the message
+        cluster_id (str): The unique ID of the cluster being acted on
+
+    Returns:
+        Exception: The handler exception to raise
+    """
+    code = error.response.get("Error", {}).get("Code")
+    LOG.warning("%s failed for cluster %s with %s", action, cluster_id, code)
+    if code in THROTTLING_CODES:
+        return exceptions.Throttling(f"Failed {action}: {error}")
+    if code in INVALID_REQUEST_CODES:
+        return exceptions.InvalidRequest(f"Failed {action}: {error}")
+    return exceptions.InternalFailure(f"Failed {action}: {error}")
+
 
 def get_cluster_info(session: Optional[SessionProxy], cluster_id: str) -> dict:
-    """This function will gather all information from a describe cluster
-    call to the given cluster ID
+    """This function will describe the given cluster ID and keep only
+    the attributes this resource uses, the tags and the step concurrency
+    level
 
     Attributes:
         session (Optional[SessionProxy]): The session proxy for connecting
@@ -36,45 +111,49 @@ def get_cluster_info(session: Optional[SessionProxy], cluster_id: str) -> dict:
         cluster_id (str): The unique ID of the cluster to get details from
 
     Returns:
-        dict: A dictionary of the cluster attributes
+        dict: A dictionary with the Tags and StepConcurrencyLevel of the
+            cluster under the "Cluster" key
     """
-    client = session.client('emr')
+    client = get_emr_client(session)
     LOG.info("Getting all info for cluster %s", cluster_id)
-    response = client.describe_cluster(
-        ClusterId=cluster_id
-    )
-    LOG.info("RESPONSE: %s", response)
+    try:
+        cluster = client.describe_cluster(
+            ClusterId=cluster_id
+        )["Cluster"]
+    except ClientError as client_error:
+        if client_error.response.get("Error", {}).get("Code") \
+                in NOT_FOUND_CODES:
+            raise exceptions.NotFound(TYPE_NAME, cluster_id) from client_error
+        raise
+    response = {
+        "Cluster": {
+            "Tags": cluster.get("Tags", []),
+            "StepConcurrencyLevel": cluster.get("StepConcurrencyLevel"),
+        }
+    }
     return response
 
 
-def get_uid(session: Optional[SessionProxy], cluster_id: str) -> str:
-    """This function will retreive the value of the tag "StepConcurrencyUID"
-    from the given cluster ID
+def get_uid_and_level(cluster: dict) -> Tuple[Optional[str], Optional[int]]:
+    """This function will read both the "StepConcurrencyUID" tag and the
+    StepConcurrencyLevel attribute from a single cluster description
 
     Attributes:
-        session (Optional[SessionProxy]): The session proxy for connecting
-            to the needed AWS API client
-        cluster_id (str): The unique ID of the cluster to get details from
+        cluster (dict): The "Cluster" entry of a describe cluster response
 
     Returns:
-        str: The value of the StepConcurrencyUID tag in the cluster
+        Tuple[Optional[str], Optional[int]]: The value of the
+            StepConcurrencyUID tag and the StepConcurrencyLevel, each None
+            if it is missing
     """
-    response = get_cluster_info(session, cluster_id)
-    LOG.info("Gathering tags for cluster %s", cluster_id)
-    tags = response["Cluster"]["Tags"]
-    LOG.info(tags)
-    for tag in tags:
-        if tag['Key'] == "StepConcurrencyUID":
-            LOG.info("Found concurrency tag")
-            LOG.info(tag["Value"])
-            return tag["Value"]
-    LOG.info("Didn't find concurrency tag")
-    return None
-
-
-def get_concurrency_level(session: Optional[SessionProxy], cluster_id: str) -> str:
-    """This function will retreive the current value of StepConcurrencyLevel
-    from the given cluster
+    uid = next((tag["Value"] for tag in cluster.get("Tags", ())
+                if tag["Key"] == "StepConcurrencyUID"), None)
+    return uid, cluster.get("StepConcurrencyLevel")
+
+
+def get_uid(session: Optional[SessionProxy], cluster_id: str) -> str:
+    """This function will retreive the value of the tag "StepConcurrencyUID"
+    from the given cluster ID
 
     Attributes:
         session (Optional[SessionProxy]): The session proxy for connecting
@@ -82,11 +161,10 @@ def get_concurrency_level(session: Optional[SessionProxy], cluster_id: str) -> s
         cluster_id (str): The unique ID of the cluster to get details from
 
     Returns:
-        str: The value of the StepConcurrencyLevel attribute in the cluster
+        str: The value of the StepConcurrencyUID tag in the cluster
     """
     response = get_cluster_info(session, cluster_id)
-    LOG.info("Gathering concurrency for cluster %s", cluster_id)
-    return response["Cluster"]["StepConcurrencyLevel"]
+    return get_uid_and_level(response["Cluster"])[0]
 
 
 @resource.handler(Action.CREATE)
@@ -117,26 +195,31 @@ def create_handler(
         status=OperationStatus.IN_PROGRESS,
         resourceModel=model,
     )
-    model.UID = "cluster:" + model.ClusterId
-    model.StepConcurrencyLevel = int(model.StepConcurrencyLevel)
-    uid = get_uid(session, model.ClusterId)
-    LOG.info("UID: %s", uid)
-    if uid == model.UID:
-        raise exceptions.AlreadyExists(TYPE_NAME, model.ClusterId)
-    if model.StepConcurrencyLevel < 1 or model.StepConcurrencyLevel > 256:
+    model.UID = f"cluster:{model.ClusterId}"
+    level = model.StepConcurrencyLevel = int(model.StepConcurrencyLevel)
+    if not MIN_LEVEL <= level <= MAX_LEVEL:
         raise exceptions.InvalidRequest(
-            f"Step Concurency Level must be between 1 and 256, \
-                {model.StepConcurrencyLevel} was given.")
+            LEVEL_ERROR.format(MIN_LEVEL, MAX_LEVEL, level))
     try:
-        client = session.client('emr')
+        try:
+            uid = get_uid(session, model.ClusterId)
+        except exceptions.NotFound as not_found:
+            # The cluster is an input to create, not the resource itself.
+            raise exceptions.InvalidRequest(
+                f"Cluster {model.ClusterId} was not found") from not_found
+        LOG.info("UID: %s", uid)
+        if uid == model.UID:
+            raise exceptions.AlreadyExists(TYPE_NAME, model.ClusterId)
+        client = get_emr_client(session)
         LOG.info("Setting concurrency to %s for cluster %s",
-                 model.StepConcurrencyLevel, model.ClusterId)
+                 level, model.ClusterId)
         response = client.modify_cluster(
             ClusterId=model.ClusterId,
-            StepConcurrencyLevel=int(model.StepConcurrencyLevel)
+            StepConcurrencyLevel=level
         )
-        LOG.info("RESPONSE TO SET CONCURRENCY:")
-        LOG.info(response)
+        log_response("Set concurrency", response)
+        # The tag marks the resource as created, so only add it once the
+        # concurrency level has been set.
         LOG.info("Setting UID tag to %s", model.ClusterId)
         tag_response = client.add_tags(
             ResourceId=model.ClusterId,
@@ -147,13 +230,11 @@ def create_handler(
                 }
             ]
         )
-        LOG.info("RESPONSE TO ADD TAGS:")
-        LOG.info(tag_response)
+        log_response("Add tags", tag_response)
         progress.status = OperationStatus.SUCCESS
-    except Exception as unexpected_exception:
-        LOG.error(str(unexpected_exception))
-        raise exceptions.InternalFailure(
-            f"Failed Create: {str(unexpected_exception)}")
+    except ClientError as client_error:
+        raise handler_error(
+            client_error, "Create", model.ClusterId) from client_error
     return progress
 
 
@@ -184,34 +265,37 @@ def update_handler(
         status=OperationStatus.IN_PROGRESS,
         resourceModel=model,
     )
-    LOG.info("UPDATE HANDLER")
-    LOG.info("MODEL")
-    LOG.info(model)
-    LOG.info("PREVIOUS")
-    LOG.info(previous_model)
-    model.StepConcurrencyLevel = int(model.StepConcurrencyLevel)
-    if model.UID != previous_model.UID:
+    LOG.info("Update Handler")
+    LOG.debug("Model: %s", model)
+    LOG.debug("Previous model: %s", previous_model)
+    level = model.StepConcurrencyLevel = int(model.StepConcurrencyLevel)
+    if previous_model is not None and model.UID != previous_model.UID:
         raise exceptions.InvalidRequest("Cannot update the UID")
-    if model.StepConcurrencyLevel < 1 or model.StepConcurrencyLevel > 256:
+    if not MIN_LEVEL <= level <= MAX_LEVEL:
         raise exceptions.InvalidRequest(
-            f"Step Concurency Level must be between 1 and 256, \
-                {model.StepConcurrencyLevel} was given.")
-    if model.UID != get_uid(session, model.ClusterId):
-        raise exceptions.NotFound(TYPE_NAME, model.ClusterId)
+            LEVEL_ERROR.format(MIN_LEVEL, MAX_LEVEL, level))
     try:
-        client = session.client('emr')
+        uid, current_level = get_uid_and_level(
+            get_cluster_info(session, model.ClusterId)["Cluster"])
+        if model.UID != uid:
+            raise exceptions.NotFound(TYPE_NAME, model.ClusterId)
+        if current_level == level:
+            LOG.info("Concurrency for cluster %s is unchanged",
+                     model.ClusterId)
+            progress.status = OperationStatus.SUCCESS
+            return progress
+        client = get_emr_client(session)
         LOG.info("Updating concurrency to %s for cluster %s",
-                 model.StepConcurrencyLevel, model.ClusterId)
+                 level, model.ClusterId)
         response = client.modify_cluster(
             ClusterId=model.ClusterId,
-            StepConcurrencyLevel=model.StepConcurrencyLevel
+            StepConcurrencyLevel=level
         )
-        LOG.info("RESPONSE: %s", response)
+        log_response("Update concurrency", response)
         progress.status = OperationStatus.SUCCESS
-    except Exception as unexpected_exception:
-        LOG.error(str(unexpected_exception))
-        raise exceptions.InternalFailure(
-            f"Failed Update: {str(unexpected_exception)}")
+    except ClientError as client_error:
+        raise handler_error(
+            client_error, "Update", model.ClusterId) from client_error
     return progress
 
 
@@ -241,34 +325,29 @@ def delete_handler(
         status=OperationStatus.IN_PROGRESS,
         resourceModel=model,
     )
-    LOG.info("DELETE HANDLER")
-    if get_uid(session, model.ClusterId) != model.UID:
-        raise exceptions.NotFound(TYPE_NAME, model.ClusterId)
+    LOG.info("Delete Handler")
     try:
-        client = session.client('emr')
+        if get_uid(session, model.ClusterId) != model.UID:
+            raise exceptions.NotFound(TYPE_NAME, model.ClusterId)
+        client = get_emr_client(session)
         LOG.info("Setting concurrency to default for cluster %s",
                  model.ClusterId)
         response = client.modify_cluster(
             ClusterId=model.ClusterId,
-            StepConcurrencyLevel=1
+            StepConcurrencyLevel=MIN_LEVEL
         )
-        LOG.info("RESPONSE:")
-        LOG.info("RESPONSE:")
-        LOG.info(response)
+        log_response("Reset concurrency", response)
         progress.resourceModel = None
         LOG.info("Removing Tags")
         tags_response = client.remove_tags(
             ResourceId=model.ClusterId,
             TagKeys=["StepConcurrencyUID"]
         )
-        LOG.info("TAG REMOVAL RESPONSE")
-        LOG.info(tags_response)
-        LOG.info("TAG REMOVAL RESPONSE: %s", tags_response)
+        log_response("Remove tags", tags_response)
         progress.status = OperationStatus.SUCCESS
-    except Exception as unexpected_exception:
-        LOG.error(str(unexpected_exception))
-        raise exceptions.InternalFailure(
-            f"Failed Delete: {str(unexpected_exception)}")
+    except ClientError as client_error:
+        raise handler_error(
+            client_error, "Delete", model.ClusterId) from client_error
     return progress
 
 
@@ -292,15 +371,19 @@ def read_handler(
         ProgressEvent: An event with the status of the action
     """
     model = request.desiredResourceState
-    if model.UID != get_uid(session, model.ClusterId):
-        raise exceptions.NotFound(TYPE_NAME, model.ClusterId)
     try:
-        model.StepConcurrencyLevel = get_concurrency_level(
-            session, model.ClusterId)
-    except Exception as unexpected_exception:
-        LOG.error(str(unexpected_exception))
+        response = get_cluster_info(session, model.ClusterId)
+    except ClientError as client_error:
+        raise handler_error(
+            client_error, "Read", model.ClusterId) from client_error
+    uid, level = get_uid_and_level(response["Cluster"])
+    if uid != model.UID:
+        raise exceptions.NotFound(TYPE_NAME, model.ClusterId)
+    if level is None:
         raise exceptions.InternalFailure(
-            f"Failed Read: {str(unexpected_exception)}")
+            f"Failed Read: cluster {model.ClusterId} did not report a "
+            "StepConcurrencyLevel")
+    model.StepConcurrencyLevel = level
     return ProgressEvent(
         status=OperationStatus.SUCCESS,
         resourceModel=model,